@@ -1,9 +1,12 @@
 # Import all necessary modules from rds_query_utils and rds_clean_utils
 from .rds_clean_utils import clean_empty_none, convert_dates, convert_integer
-from .rds_query_utils import unpack_query, build_schema, build_query, build_clean_list, rds_sql_pull
+from .rds_query_utils import unpack_query, build_schema, build_query, build_params, build_clean_list, rds_sql_pull, rds_copy_pull, rds_bulk_insert
 
 # Import the RDS class from the main module file
 from .rds_processor import RDS
 
 # Import the connection utility
-from .rds_connection import connect_rds
+from .rds_connection import connect_rds, release_rds
+
+# Import the package exception type
+from .rds_errors import RDSError
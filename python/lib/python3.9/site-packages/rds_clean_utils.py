@@ -4,10 +4,10 @@ in the rds_processor.py file.
 
 Functions:
       
-    - clean_empty_none(field, df, removed): 
+    - clean_empty_none(field, df, removed=None): 
       Cleans rows with empty or None values from the specified field in the DataFrame. 
       
-    - convert_dates(field, df, output_format=None): 
+    - convert_dates(field, df, output_format=None, input_format=None): 
       Converts string dates in the specified field to datetime objects in the DataFrame. 
       
     - convert_integer(field, df): 
@@ -25,6 +25,7 @@ Classes:
 Dependencies:
     - pandas
     - datetime
+    - rds_errors
 
 Created by: Charles Ross
 Contact: charles.ross@mbakerintl.com
@@ -36,6 +37,9 @@ Last updated by: Charles Ross on 11/19/2024
 
 import pandas as pd
 
+################    IMPORT ERRORS    ######################
+from rds_errors import RDSError
+
 
 
 
@@ -43,7 +47,7 @@ import pandas as pd
 
 #----------------------------------------------------------------
 
-def clean_empty_none(field, df, removed):
+def clean_empty_none(field, df, removed = None):
 
     """
     Cleans rows with empty or None values from the specified field in the DataFrame and maintains a log of the removed rows.
@@ -54,8 +58,9 @@ def clean_empty_none(field, df, removed):
         The name of the field to be checked for empty or None values.
     df : pd.DataFrame
         The DataFrame to be cleaned.
-    removed : pd.DataFrame
-        A DataFrame to store rows that are removed during the cleaning process.
+    removed : pd.DataFrame, optional
+        A DataFrame to store rows that are removed during the cleaning process. If not provided, only the rows removed 
+        by this call are returned, letting callers collect them and concatenate once.
 
     Returns:
     --------
@@ -64,49 +69,41 @@ def clean_empty_none(field, df, removed):
 
     Raises:
     -------
-    Exception
-        If the specified field is not in the DataFrame or if there is an error adding rows to the cleaned DataFrame.
+    RDSError
+        If the specified field is not in the DataFrame.
 
     Explanation:
     ------------
-    This function iterates through the DataFrame, checking for empty or None values in the specified field. 
-    Rows with empty or None values are added to the `removed` DataFrame, while other rows are added to the `cleaned_df` DataFrame. 
-    If the specified field is not found in the DataFrame, an exception is raised. The function ensures that the DataFrame is cleaned 
-    by removing rows with empty or None values in the specified field and returns the cleaned DataFrame along with the removed rows.
+    This function builds a single boolean mask over the specified field, flagging values that are None, NaN, or empty strings. 
+    Numeric and datetime fields cannot hold empty strings, so only their missing values are checked. 
+    Rows matching the mask are appended to the `removed` DataFrame in one concatenation, while the remaining rows are returned 
+    as the cleaned DataFrame. If the specified field is not found in the DataFrame, an exception is raised. The original index 
+    and column dtypes are preserved in both outputs.
 
     Note:
     -----
-    Any discrepancy in the field names or errors during the row addition process will raise an exception.
+    Any discrepancy in the field names will raise an exception.
     """
-    
-    #Create Empty DataFrame
-    cleaned_df = pd.DataFrame()
 
     #Check if Field in Dataframe
     if field not in df.columns:
-        raise Exception(f"Error: {field} Not In DataFrame")
-
-
-    #Itterate Through DataFrame and Check for Empty Values
-    for index, row in df.iterrows():
-        
-        #Create Add Check for Row
-        add_check = True
-
-        #Check for None or Empty Strings in Row Fields
-        if row[field] == None or row[field] == '':
-            add_check = False
+        raise RDSError(f"Error: {field} Not In DataFrame")
 
-        #If Add Check Still True, Add to Cleaned DataFrame
-        try:
-            if add_check == True:
-                cleaned_df = pd.concat([cleaned_df, pd.DataFrame(row).T])
+    #Flag None, NaN, and Empty String Values in Field (Numeric and Datetime Fields Cannot Hold Empty Strings)
+    column = df[field]
+    if pd.api.types.is_numeric_dtype(column) or pd.api.types.is_datetime64_any_dtype(column):
+        empty_mask = column.isna()
+    else:
+        empty_mask = column.isna() | column.eq('')
 
-            elif add_check == False:
-                removed = pd.concat([removed, pd.DataFrame(row).T])
+    #Split Rows into Cleaned and Removed DataFrames
+    cleaned_df = df.loc[~empty_mask].copy()
 
-        except Exception as e:
-            raise Exception(f'Error: Failed to Add Row to Cleaned DataFrame {e}')
+    #Add Removed Rows to Existing Removed DataFrame if Passed
+    if removed is None:
+        removed = df.loc[empty_mask]
+    else:
+        removed = pd.concat([removed, df.loc[empty_mask]])
 
         
     return cleaned_df, removed
@@ -116,7 +113,7 @@ def clean_empty_none(field, df, removed):
 
 #----------------------------------------------------------------
 
-def convert_dates(field, df, output_format = None):
+def convert_dates(field, df, output_format = None, input_format = None):
 
     """
     Converts string dates in the specified field to datetime objects in the DataFrame.
@@ -129,6 +126,8 @@ def convert_dates(field, df, output_format = None):
         The DataFrame containing the field to be converted.
     output_format : str, optional
         The format to which the datetime objects should be converted. If not provided, the default datetime format is used.
+    input_format : str, optional
+        The strptime format of the incoming date strings. If not provided, pandas infers the format.
 
     Returns:
     --------
@@ -137,13 +136,14 @@ def convert_dates(field, df, output_format = None):
 
     Raises:
     -------
-    Exception
+    RDSError
         If the specified field is not in the DataFrame or if there is an error converting the field to datetime.
 
     Explanation:
     ------------
     This function checks if the specified field is present in the DataFrame. It then converts the string dates in the field to datetime objects 
-    using `pandas.to_datetime()`. If an output format is provided, the datetime objects are converted to the specified string format. 
+    using `pandas.to_datetime()` with `cache=True`, so repeated date strings are only parsed once. Passing an `input_format` 
+    lets pandas use its fixed-format parser instead of inferring the format. If an output format is provided, the datetime objects are converted to the specified string format. 
     If there is any error during the conversion process, an exception is raised. The function ensures that the date strings in the specified field 
     are correctly converted to datetime objects or formatted strings and returns the updated DataFrame.
 
@@ -154,11 +154,11 @@ def convert_dates(field, df, output_format = None):
 
     #Check if Field in DataFrame
     if field not in df.columns:
-        raise Exception(f"Error: {field} Not In DataFrame")
+        raise RDSError(f"Error: {field} Not In DataFrame")
 
     
     try:
-        df[field] = pd.to_datetime(df[field])
+        df[field] = pd.to_datetime(df[field], format = input_format, cache = True)
         
         #Convert to String Format if output_format passed
         if output_format != None:
@@ -167,7 +167,7 @@ def convert_dates(field, df, output_format = None):
         return df
     
     except Exception as e:
-       raise Exception(f"Error: Could not convert {field} to datetime:  Traceback{e}")
+       raise RDSError(f"Error: Could not convert {field} to datetime:  Traceback{e}") from e
     
 
 
@@ -193,30 +193,42 @@ def convert_integer(field, df):
 
     Raises:
     -------
-    Exception
+    RDSError
         If the specified field is not in the DataFrame or if there is an error converting the field to integers.
 
     Explanation:
     ------------
     This function checks if the specified field is present in the DataFrame. It then converts the string numbers in the field to integers 
-    using `pandas.to_numeric()` with error coercion. If there is any error during the conversion process, an exception is raised. 
+    using `pandas.to_numeric()` with error coercion. Values that cannot be parsed, that have a fractional part, or that fall outside 
+    the 64-bit integer range are coerced to nulls rather than raising. The field is always stored as the nullable `Int64` dtype, so it keeps the same dtype on every pull 
+    and is not widened to float when it contains nulls. 
     The function ensures that the string numbers in the specified field are correctly converted to numeric values and returns the updated DataFrame.
 
     Note:
     -----
-    Any discrepancy in the field names or errors during the conversion process will raise an exception.
+    Any discrepancy in the field names will raise an exception.
     """
 
     #Check if Field in DataFrame
     if field not in df.columns:
-        raise Exception(f"Error: {field} Not In DataFrame")
+        raise RDSError(f"Error: {field} Not In DataFrame")
     
     try:
-        df[field] = pd.to_numeric(df[field], errors='coerce')
+        numbers = pd.to_numeric(df[field], errors='coerce')
+
+        #Null Values with a Fractional Part or Outside the Int64 Range, So the Field Always Stores as Nullable Integers
+        if pd.api.types.is_float_dtype(numbers):
+            storable = numbers.mod(1).eq(0) & numbers.ge(-2.0**63) & numbers.lt(2.0**63)
+            numbers = numbers.where(storable.fillna(False))
+
+        elif pd.api.types.is_unsigned_integer_dtype(numbers):
+            numbers = numbers.where(numbers.le(2**63 - 1))
+
+        df[field] = numbers.astype('Int64')
         return df
-    
+
     except Exception as e:
-        raise Exception(f"Error: Could not convert {field} to integer:  Traceback{e}")
+        raise RDSError(f"Error: Could not convert {field} to integer:  Traceback{e}") from e
 
 
 
@@ -238,24 +250,16 @@ def update_field_names(self, table_fields, new_fields):
         
         Raises:
         -------
-        Exception
-            If dataframe is empty or rename fails.
+        RDSError
+            If dataframe is empty.
         """
         
         #Create Dictionary for Fields Update
         field_dict = dict(zip(table_fields, new_fields))
 
-        #Update Fields
-        for table_field, new_field in field_dict.items():
+        #Check if DF Empty
+        if self.df.empty == True:
+            raise RDSError("Error: Cannot Rename Columns of Empty Dataframe")
 
-            if self.df.empty == False :
-            
-                try:
-                    #Update the Column Name
-                    self.df.rename(columns={table_field: new_field}, inplace=True)
-
-                except Exception as e:
-                    raise Exception(f"Failure to Convert {table_field} to {new_field}")
-    
-            else:
-                raise Exception("Error: Cannot Rename Columns of Empty Dataframe")
\ No newline at end of file
+        #Update All Column Names in a Single Rename
+        self.df.rename(columns=field_dict, inplace=True)
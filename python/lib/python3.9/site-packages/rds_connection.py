@@ -4,13 +4,17 @@ It includes utility functions to manage these connections efficiently and handle
 The script utilizes the `psycopg2` library for database connectivity, ensuring reliable and secure access to the database.
 
 Functions: 
-    - rds_connection(username, password, db, server): 
+    - rds_connection(username, password, db, server, attempts=1, pooled=False, connect_timeout=None): 
       Establishes a connection to an AWS RDS database using the provided credentials and notifies a Teams channel in case of connection failure.
 
+    - release_rds(conn): 
+      Returns a pooled connection from connect_rds to its connection pool for reuse, closing unpooled connections.
+
       
 Dependencies:
 
     - psycopg2
+    - rds_errors
 
     
 Created by: Charles Ross
@@ -21,14 +25,49 @@ Last updated by: Charles Ross on 11/19/2024.
 
 
 ################    IMPORT PACKAGES    ######################
+import time
+import random
+import threading
 import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+from psycopg2.pool import PoolError
+
+################    IMPORT ERRORS    ######################
+from rds_errors import RDSError
+
+
+################    CONNECTION POOLS    ######################
+
+#Connection Pools Keyed by Credentials, Kept for the Life of the Process
+_POOLS = {}
+
+#Pool Key and Connection for Each Leased Connection
+_LEASES = {}
+
+#Guard the Pool and Lease Dictionaries Across Threads (Never Held While Connecting)
+_POOL_LOCK = threading.Lock()
+
+#Base and Maximum Delay in Seconds Between Connection Attempts
+_RETRY_BASE = 1.0
+_RETRY_CAP = 30.0
+
+#Connection Failure Messages Worth Retrying (Server Unreachable, Slow, Starting, or Out of Connection Slots)
+_TRANSIENT_ERRORS = (
+    "connection refused",
+    "timeout expired",
+    "server closed the connection unexpectedly",
+    "too many clients",
+    "remaining connection slots are reserved",
+    "the database system is starting up",
+    "the database system is shutting down"
+)
 
 
 ################    RDS TABLE CONNECTION    ######################
 
 #----------------------------------------------------------------
 
-def connect_rds(username, password, db, server):
+def connect_rds(username, password, db, server, attempts = 1, pooled = False, connect_timeout = None):
     
     """
     Establishes a connection to an AWS RDS database using the provided credentials and notifies a Teams channel in case of connection failure.
@@ -36,39 +75,183 @@ def connect_rds(username, password, db, server):
     Parameters:
     - username: Username for database connection.
     - password: Password for the database connection.
+    - attempts: Number of times a transient connection failure is tried before giving up, at least 1. Default is 1 (no retries).
+    - pooled: If True, leases the connection from a pool kept per set of credentials. Default is False.
+    - connect_timeout: Seconds to wait for the database to accept a new connection. Default is None (wait indefinitely).
 
     Explanation:
-    This function attempts to connect to an AWS RDS database using the given credentials. It uses the psycopg2 library to establish the connection 
-    and returns the connection object if successful. If the connection attempt fails, an exception is raised, and the Teams channel is 
+    This function opens a connection to an AWS RDS database using the psycopg2 library. TCP keepalives are enabled so idle 
+    connections are not silently dropped, and with `connect_timeout` set, new connections give up after that many seconds instead of hanging the caller. 
+    With `pooled` set, the connection is leased from a psycopg2 `ThreadedConnectionPool` kept per set of credentials: the first call 
+    opens the pool, later calls reuse its idle connections and skip the TCP, TLS, and authentication handshake. Pooled callers must 
+    hand each connection back with `release_rds(conn)`; connections the caller closed are reclaimed when the pool runs out, and if the 
+    pool is still exhausted an unpooled connection is opened instead of failing. Unpooled connections behave as plain psycopg2 
+    connections and are freed when the caller drops them. With `attempts` above 1, transient connection failures (a refused or timed 
+    out connection, or a database starting up or at its connection limit) are retried up to `attempts` times, waiting an exponentially growing, 
+    jittered delay between tries so concurrent callers do not retry in step. Other failures, such as failed authentication or a 
+    missing database, are raised at once. 
+    It returns the connection and a cursor if successful. If the connection attempt fails, an exception is raised, and the Teams channel is 
     notified about the RDS connection failure by sending an error alert with details. The process is stopped by raising an exception, 
     indicating the failure to connect to the RDS database.
 
     Return:
-    The connection object if the connection is successful (None otherwise).
+    The connection and cursor objects if the connection is successful. An RDSError is raised otherwise.
 
     Note:
     The Team's channel notification is triggered when there is a connection failure, providing an immediate alert to relevant 
     team members to address the issue promptly.
     """
 
+    #Check at Least One Attempt is Made
+    if attempts < 1:
+        raise RDSError(f"Error: attempts Must Be at Least 1, Got {attempts}")
+
+    #Pool Key for these Credentials and Connection Settings
+    key = (server, db, username, password, connect_timeout)
+
+    for attempt in range(attempts):
+
+        try:
+
+            #Lease a Connection from the Pool for these Credentials, or Connect Directly
+            if pooled == True:
+                conn = _lease_connection(key)
+            else:
+                conn = psycopg2.connect(**_connect_args(key))
+
+            cursor = conn.cursor()
+
+            #Return the Connection Object if Successful
+            return conn, cursor
+
+
+        #Wait and Retry Transient Connection Failures, Outside the Pool Lock
+        except psycopg2.OperationalError as e:
+
+            if (attempts == 1) or not any(message in str(e).lower() for message in _TRANSIENT_ERRORS):
+                raise RDSError(f"Failed to Connect to RDS Database: {e}") from e
+
+            if attempt == attempts - 1:
+                raise RDSError(f"Failed to Connect to RDS Database after {attempts} Attempts: {e}") from e
+
+            delay = min(_RETRY_CAP, _RETRY_BASE * (2 ** attempt))
+            time.sleep(delay * (1 + random.random() * 0.5))
+
+
+        #Wrap Other Database and Pool Errors, Letting Programming Errors Propagate
+        except psycopg2.Error as e:
+            
+            # Raise Exception to Stop Process if Failure
+            raise RDSError(f"Failed to Connect to RDS Database: {e}") from e
+
+
+
+
+#----------------------------------------------------------------
+
+def _connect_args(key):
+
+    #Connection Settings for a Pool Key, Shared by Pooled and Unpooled Connections
+    server, db, username, password, connect_timeout = key
+
+    args = {
+        'host': server,
+        'port': 5432,
+        'user': username,
+        'password': password,
+        'database': db,
+        'keepalives': 1,
+        'keepalives_idle': 30,
+        'keepalives_interval': 10
+    }
+
+    #Bound the Connection Handshake Only When a Timeout Was Requested
+    if connect_timeout != None:
+        args['connect_timeout'] = connect_timeout
+
+    return args
+
+
+
+
+#----------------------------------------------------------------
+
+def _lease_connection(key):
+
+    #Find the Pool for these Credentials
+    with _POOL_LOCK:
+        pool = _POOLS.get(key)
+
+    #Open the Pool on First Use, Outside the Lock Since Opening Connects to the Database
+    if pool is None:
+        new_pool = ThreadedConnectionPool(minconn = 1, maxconn = 10, **_connect_args(key))
+
+        with _POOL_LOCK:
+            pool = _POOLS.setdefault(key, new_pool)
+
+        #Close the New Pool if Another Thread Opened One First
+        if pool is not new_pool:
+            new_pool.closeall()
+
     try:
+        conn = pool.getconn()
 
-        #Connect to the AWS RDS Database
-        conn = psycopg2.connect(
-            host = server,
-            port = 5432,
-            user = username,
-            password = password,
-            database= db
-        )
+    except PoolError:
 
-        cursor = conn.cursor()
+        #Reclaim Connections the Caller Closed Without Releasing
+        with _POOL_LOCK:
+            closed = [(lease_id, leased) for lease_id, (lease_key, leased) in _LEASES.items() if lease_key == key and leased.closed]
+            for lease_id, leased in closed:
+                del _LEASES[lease_id]
 
-        #Return the Connection Object if Successful
-        return conn, cursor
-    
+        for lease_id, leased in closed:
+            pool.putconn(leased)
+
+        #Open an Unpooled Connection if the Pool is Still Exhausted
+        try:
+            conn = pool.getconn()
+
+        except PoolError:
+            return psycopg2.connect(**_connect_args(key))
+
+    #Replace an Idle Connection that was Closed While in the Pool
+    if conn.closed:
+        pool.putconn(conn)
+        conn = pool.getconn()
+
+    with _POOL_LOCK:
+        _LEASES[id(conn)] = (key, conn)
+
+    return conn
+
+
+
+
+#----------------------------------------------------------------
+
+def release_rds(conn):
+
+    """
+    Returns a pooled connection from connect_rds to its connection pool for reuse, closing unpooled connections.
+
+    Parameters:
+    - conn: Connection object returned by connect_rds.
+
+    Explanation:
+    This function looks up the pool the connection was leased from and returns it with `putconn`. Any open transaction 
+    is rolled back by the pool, and connections the caller already closed are discarded instead of reused. Connections 
+    that did not come from a pool, because `pooled` was not set or the pool was exhausted, are closed.
+    """
+
+    #Find the Pool the Connection Came From
+    with _POOL_LOCK:
+        lease = _LEASES.pop(id(conn), None)
+
+    #Close Unpooled Connections
+    if lease is None:
+        conn.close()
+        return
 
-    except Exception as e:
-        
-        # Raise Exception to Stop Process if Failure
-        raise Exception(f"Failed to Connect to RDS Database: {e}")
\ No newline at end of file
+    #Return the Connection to the Pool
+    key, leased = lease
+    _POOLS[key].putconn(leased)
@@ -0,0 +1,25 @@
+"""
+This Python script defines the exception type raised by the RDS connection, query, cleaning, and processing modules
+in this package, so callers can catch package failures separately from unrelated errors.
+
+Classes:
+    - RDSError:
+      Raised when connecting to, querying, or cleaning data from the AWS RDS database fails.
+"""
+
+
+
+################    RDS ERROR    ######################
+
+#----------------------------------------------------------------
+
+class RDSError(Exception):
+
+    """
+    Raised when connecting to, querying, or cleaning data from the AWS RDS database fails.
+
+    Explanation:
+    ------------
+    `RDSError` subclasses `Exception`, so existing `except Exception` handlers keep working. When the failure is caused by
+    another exception, it is chained with `raise RDSError(...) from e` so the original traceback is kept.
+    """
@@ -14,6 +14,7 @@ Dependencies:
     - datetime
     - rds_query_utils
     - rds_clean_utils
+    - rds_errors
 
 Created by: Charles Ross
 Contact: charles.ross@mbakerintl.com
@@ -24,18 +25,24 @@ Last updated by: Charles Ross on 11/19/2024
 
 ################    IMPORT PACKAGES    ######################
 import pandas as pd
+from functools import cached_property
+
+################    IMPORT ERRORS    ######################
+from rds_errors import RDSError
 
 ################    IMPORT QUERY UTILS    ######################
 from rds_query_utils import unpack_query
 from rds_query_utils import build_schema
 from rds_query_utils import build_query
+from rds_query_utils import build_params
 from rds_query_utils import build_clean_list
 from rds_query_utils import rds_sql_pull
-
-################    IMPORT CLEANING UTILS    ######################
-from rds_clean_utils import clean_empty_none
-from rds_clean_utils import convert_dates
-from rds_clean_utils import convert_integer
+from rds_query_utils import rds_copy_pull
+from rds_query_utils import cache_key
+from rds_query_utils import template_key
+from rds_query_utils import cached_schema
+from rds_query_utils import cached_query
+from rds_query_utils import cached_clean_list
 
 
 
@@ -51,9 +58,9 @@ class RDS:
 
     Methods:
     --------
-    __init__(conn, cursor, query_package=None, auto=True, schema=None, exclude=None, query=None):
-        Initializes the RDS class with database connection, cursor, and query details, 
-        and sets up the schema and cleaning lists.
+    __init__(conn, cursor=None, query_package=None, auto=True, schema=None, exclude=None, query=None, use_copy=False, dtype_backend=None, distinct=False, filter_empty=False, keep_intermediates=False):
+        Initializes the RDS class with database connection, cursor, and query details. 
+        The schema, query, and cleaning lists are built on first access.
 
     check_schema(df):
         Validates if the DataFrame matches the expected schema defined in the class.
@@ -61,6 +68,9 @@ class RDS:
     clean_table(data):
         Cleans the provided DataFrame based on predefined cleaning steps and maintains a log of the cleaning versions.
 
+    get_version(step):
+        Rebuilds the rows present after a logged cleaning step from the original DataFrame.
+
     query_to_df(clean=True):
         Executes the stored SQL query, validates the schema, and optionally cleans the resulting DataFrame.
     
@@ -68,14 +78,19 @@ class RDS:
     -----------
     conn : psycopg2.extensions.connection
         Connection to the AWS RDS database.
-    cursor : psycopg2.extensions.cursor
-        Cursor for executing database queries.
+    cursor : psycopg2.extensions.cursor or None
+        Cursor passed in by the caller, kept for compatibility. Each pull opens its own cursor on `conn`, 
+        so several RDS objects can share one connection.
     query_package : dict or None
         Package containing query details, source, and join information.
     schema : list or None
-        List of expected columns in the DataFrame.
+        List of expected columns in the DataFrame, built on first access.
+    query : str or None
+        SQL query used to pull the DataFrame, built on first access.
+    params : dict or None
+        Values bound to the query placeholders, such as the project id of a package-built query, built on first access.
     clean_list : list
-        List of cleaning steps to be applied to the DataFrame.
+        List of cleaning steps to be applied to the DataFrame, built on first access.
     df : pd.DataFrame
         DataFrame to hold query results.
     removed : pd.DataFrame
@@ -83,11 +98,25 @@ class RDS:
     duplicates : pd.DataFrame
         Dataframe that stores the removed duplicates from the DataFrame.
     cleaning_steps : list
-        List to log versions of the DataFrame at each cleaning step.
+        List logging the step name, field, row count, and removed index at each cleaning step, 
+        with the original and final DataFrames stored in the first and last entries.
     archive : list
         Contains the list of files to be added to the S3 Archive
     fields_missing : list
         List of fields missing from the DataFrame if schema validation fails.
+    use_copy : bool
+        If True, pulls query results through PostgreSQL's COPY protocol (`rds_copy_pull`) instead of a server-side cursor.
+    dtype_backend : str or None
+        Optional pandas dtype backend ('pyarrow' or 'numpy_nullable') applied to pulled DataFrames; requires pandas 2.0 or later.
+    distinct : bool
+        If True, duplicate rows are removed by PostgreSQL with SELECT DISTINCT instead of by pandas after the pull, 
+        so `duplicates` stays empty. A manually passed query is expected to deduplicate itself.
+    filter_empty : bool
+        If True, rows that are NULL or empty in fields marked for NULL cleaning are filtered by PostgreSQL instead of pulled 
+        and removed during cleaning, so they do not appear in `removed`.
+    keep_intermediates : bool
+        If True, each entry in `cleaning_steps` also stores a copy of the DataFrame after that step, for debugging. 
+        By default only the original and final DataFrames are stored.
 
     Explanation:
     ------------
@@ -98,20 +127,31 @@ class RDS:
     """
 
 
-    def __init__(self, conn, cursor, query_package = None, auto = True, schema = None, exclude = None, query = None):
+    def __init__(self, conn, cursor = None, query_package = None, auto = True, schema = None, exclude = None, query = None, use_copy = False, dtype_backend = None, distinct = False, filter_empty = False, keep_intermediates = False):
         
         #Store Connector and Query Package 
         self.conn = conn
         self.cursor = cursor
         self.query_package = query_package
+        self.use_copy = use_copy
+        self.dtype_backend = dtype_backend
+        self.distinct = distinct
+        self.filter_empty = filter_empty
+        self.keep_intermediates = keep_intermediates
 
         #Unpack the Query
         self.source, self.join_list = unpack_query(query_package)
 
-        #Create Schema, Query, and Clean List
-        self.schema = build_schema(source = self.source, join_list = self.join_list, schema = schema, exclude = exclude)
-        self.query = build_query(query = query, source = self.source, join_list = self.join_list)
-        self.clean_list = build_clean_list(join_list = self.join_list)
+        #Store Schema and Query Inputs, Schema, Query, and Clean List are Built on First Access
+        self._schema_input = schema
+        self._query_input = query
+        self._exclude = exclude
+
+        #Key Package Builds When Built from Package Alone, Reusing Builds for Packages Already Seen in Any Project
+        if (query_package != None) & (schema == None) & (query == None):
+            self._package_key = template_key(query_package)
+        else:
+            self._package_key = None
      
         #Store Empty Variables for Later Use
         self.removed = pd.DataFrame()
@@ -128,6 +168,81 @@ class RDS:
         elif auto == False:
             self.df = pd.DataFrame()
 
+
+
+
+    @cached_property
+    def schema(self):
+
+        """
+        List of expected columns in the DataFrame, built from the query package or manual schema on first access.
+        """
+
+        #Create Schema from Package Cache
+        if self._package_key != None:
+
+            #Key Exclude Collections as Sorted Lists, Since Sets Do Not Survive JSON
+            if (self._exclude != None) and (isinstance(self._exclude, str) == False):
+                exclude_key = cache_key(sorted(self._exclude))
+            else:
+                exclude_key = cache_key(self._exclude)
+
+            return cached_schema(self._package_key, exclude_key)
+
+        #Create Schema
+        return build_schema(source = self.source, join_list = self.join_list, schema = self._schema_input, exclude = self._exclude)
+
+
+
+
+    @cached_property
+    def query(self):
+
+        """
+        SQL query used to pull the DataFrame, built from the query package or manual query on first access.
+        """
+
+        #Create Query from Package Cache
+        if self._package_key != None:
+            return cached_query(self._package_key, distinct = self.distinct, filter_empty = self.filter_empty)
+
+        #Create Query
+        return build_query(query = self._query_input, source = self.source, join_list = self.join_list, distinct = self.distinct, filter_empty = self.filter_empty, parameterized = True)
+
+
+
+
+    @cached_property
+    def params(self):
+
+        """
+        Values bound to the query placeholders, taken from the query package source when the query is built from the package.
+        """
+
+        #Manually Passed Queries Carry Their Own Values
+        if self._query_input != None:
+            return None
+
+        #Create Parameters from Source
+        return build_params(source = self.source)
+
+
+
+
+    @cached_property
+    def clean_list(self):
+
+        """
+        List of cleaning steps applied to the DataFrame, built from the query package join list on first access.
+        """
+
+        #Create Clean List from Package Cache
+        if self._package_key != None:
+            return cached_clean_list(self._package_key)
+
+        #Create Clean List
+        return build_clean_list(join_list = self.join_list)
+
         
         
 
@@ -149,13 +264,14 @@ class RDS:
 
         Raises:
         -------
-        Exception
+        RDSError
             If the DataFrame is empty.
 
         Explanation:
         ------------
-        This method checks if the DataFrame (`df`) contains all the fields specified in the class attribute `self.schema`. 
-        If any fields are missing, it sets the check to False and logs the missing fields in `self.fields_missing`. 
+        This method checks if the DataFrame (`df`) contains all the fields specified in the class attribute `self.schema`, 
+        looking each field up in a set of the DataFrame columns built once per call. If any fields are missing, it sets the 
+        check to False and stores the missing fields, in schema order, in `self.fields_missing`. 
         If the DataFrame is empty, an exception is raised. The function ensures that the DataFrame structure aligns with the expected schema.
 
         Note:
@@ -170,15 +286,15 @@ class RDS:
         if df.empty == False:
         
             #Check if Fields Exist in DF
-            for field in self.schema:
-                if field not in df.columns:
-                    
-                    #Field not Found, Set Check to False and Add Missing Field to List
-                    check = False
-                    self.fields_missing.append(field)
+            columns = set(df.columns)
+            self.fields_missing = [field for field in self.schema if field not in columns]
+
+            #Field not Found, Set Check to False
+            if len(self.fields_missing) != 0:
+                check = False
 
         else:
-            raise Exception("Error: Dataframe Empty When Checking Schema")
+            raise RDSError("Error: Dataframe Empty When Checking Schema")
 
         return check
     
@@ -204,12 +320,13 @@ class RDS:
         ------------
         This method performs a series of cleaning operations on the provided DataFrame. For each step, it applies the corresponding 
         cleaning function, such as removing empty or None values, converting date strings to datetime objects, and converting 
-        string numbers to integers. The cleaned data at each step is logged in self.cleaning_versions for submittal to 
-        the archive. The final cleaned DataFrame is returned.
+        string numbers to integers. Each step is logged in self.cleaning_steps with its row count and the index of any rows it 
+        removed, rather than a full copy of the DataFrame unless `keep_intermediates` is set. A copy of the original and the final cleaned DataFrame are stored 
+        in the first and last entries for submittal to the archive. The final cleaned DataFrame is returned.
 
         Note:
         -----
-        - The `self.cleaning_versions` list logs the state of the DataFrame at each cleaning step.
+        - The `self.cleaning_steps` list logs the row count and removed index at each cleaning step; use `get_version` to rebuild a step.
         - The `self.removed` DataFrame stores rows that are removed during the cleaning process.
         """
 
@@ -217,12 +334,11 @@ class RDS:
         if len(self.cleaning_steps) != 0:
             self.cleaning_steps = []
 
-        #Reset Removed
-        if self.removed.empty == False:
-            self.removed = pd.DataFrame()
+        #Collect Removed Rows from Each Step, Combined Once After Cleaning
+        removed_parts = []
         
-        #Add Original Data to Clean Version List
-        self.cleaning_steps.append({"Step": 'Original DataFrame', "Field": None, "Result": data})
+        #Add Copy of Original Data to Clean Version List (Later Steps May Convert Fields in Place)
+        self.cleaning_steps.append({"Step": 'Original DataFrame', "Field": None, "Rows": len(data), "Removed Index": None, "Result": data.copy()})
 
         for step in self.clean_list:
             
@@ -234,31 +350,43 @@ class RDS:
             
             #Perform Cleaning
             if clean_function:
+
+                #Store Rows Before Step
+                rows_before = data.index
                 
-                #Clean Emtpy Nones from Data, Save Any Removed Fields in the Removed Data Frame.
-                if clean_function == clean_empty_none:
-                    version = "Clean Nulls and Empty Fields"
-                    data, self.removed = clean_function(field, data, self.removed)
-
-                #Convert Flagged Date Fields
-                elif clean_function == convert_dates:
-                    version = "Convert String Dates to DateTimes"
-                    data = clean_function(field, data)
+                #Clean Rows from Data, Save Any Removed Rows for the Removed Data Frame
+                if step['returns_removed'] == True:
+                    data, removed_rows = clean_function(field, data)
+
+                    if removed_rows.empty == False:
+                        removed_parts.append(removed_rows)
 
-                #Convert Strings to Integers in Flagged Fields
-                elif clean_function == convert_integer:
-                    version = "Convert String Numbers to Integers"
+                #Convert Flagged Fields
+                else:
                     data = clean_function(field, data)
 
-                #CONTINUE ADDING FUNCTIONS
+                #Store Version Label from Clean List
+                version = step['version']
 
+                #Keep Copy of Data After Step if Selected
+                if self.keep_intermediates == True:
+                    result = data.copy()
+                else:
+                    result = None
 
-                #Add Version and Step to Clean Version List    
-                self.cleaning_steps.append({"Step": version, "Field": field, "Result": data})
+                #Add Version, Step, and Removed Rows to Clean Version List    
+                removed_index = rows_before.difference(data.index, sort = False)
+                self.cleaning_steps.append({"Step": version, "Field": field, "Rows": len(data), "Removed Index": removed_index, "Result": result})
             
 
+        #Combine Removed Rows
+        if len(removed_parts) != 0:
+            self.removed = pd.concat(removed_parts)
+        else:
+            self.removed = pd.DataFrame()
+
         #Add Final DataFrame
-        self.cleaning_steps.append({"Step": 'Final DataFrame', "Field": None, "Result": data})
+        self.cleaning_steps.append({"Step": 'Final DataFrame', "Field": None, "Rows": len(data), "Removed Index": None, "Result": data})
 
         #Return Cleaned Data
         return data
@@ -266,6 +394,63 @@ class RDS:
 
 
 
+
+    def get_version(self, step):
+
+        """
+        Rebuilds the rows present after a logged cleaning step from the original DataFrame.
+
+        Parameters:
+        -----------
+        step : int
+            Position of the step in `self.cleaning_steps`.
+
+        Returns:
+        --------
+        pd.DataFrame
+            The rows of the original DataFrame that remained after the requested step.
+
+        Raises:
+        -------
+        RDSError
+            If no cleaning steps have been logged or the step is out of range.
+
+        Explanation:
+        ------------
+        This method starts from the copy of the original DataFrame stored in the first cleaning step and drops every row 
+        index logged as removed by the steps up to and including the requested one. Steps that stored a full DataFrame, 
+        such as the original and final entries, return that DataFrame directly.
+
+        Note:
+        -----
+        Rebuilt steps take their values from the original DataFrame, so field conversions applied by earlier steps are not reflected. 
+        Set `keep_intermediates` to store each step's converted DataFrame instead.
+        """
+
+        #Check if Cleaning Steps Logged
+        if len(self.cleaning_steps) == 0:
+            raise RDSError("Error: No Cleaning Steps Logged, Run clean_table First")
+
+        #Check if Step in Cleaning Steps
+        if (step < 0) or (step >= len(self.cleaning_steps)):
+            raise RDSError(f"Error: Step {step} Not In Cleaning Steps")
+
+        #Return Stored DataFrame if Available
+        if self.cleaning_steps[step]["Result"] is not None:
+            return self.cleaning_steps[step]["Result"]
+
+        #Drop Rows Removed Up to the Requested Step from the Original
+        original = self.cleaning_steps[0]["Result"]
+        dropped = [entry["Removed Index"] for entry in self.cleaning_steps[1:step + 1] if entry["Removed Index"] is not None]
+
+        if len(dropped) != 0:
+            original = original.loc[~original.index.isin(dropped[0].append(dropped[1:]))]
+
+        return original
+
+
+
+
     def query_to_df(self, clean = True):
         
         """
@@ -283,14 +468,14 @@ class RDS:
 
         Raises:
         -------
-        Exception
+        RDSError
             If the SQL query execution fails, the DataFrame schema does not match the expected schema, 
             or if the resulting DataFrame is empty.
 
         Explanation:
         ------------
-        This method executes the stored SQL query (`self.query`) and validates the resulting DataFrame against 
-        the expected schema (`self.schema`). It drops duplicate rows and updates the class attribute DataFrame (`self.df`). 
+        This method executes the stored SQL query (`self.query`) on a cursor opened for this pull and validates the resulting DataFrame against 
+        the expected schema (`self.schema`). It stores and drops duplicate rows, unless PostgreSQL already removed them, and updates the class attribute DataFrame (`self.df`). 
         If the `clean` parameter is set to True, it also applies cleaning operations to the DataFrame. 
         If the DataFrame schema does not match, it raises an exception and lists the missing fields.
 
@@ -303,19 +488,22 @@ class RDS:
         
         if (self.query != None) & (self.schema != None):
 
-            #Update DataFrame with SQL Query
-            data = rds_sql_pull(self.cursor, self.query)
+            #Update DataFrame with SQL Query, Using a Cursor Opened for this Pull
+            with self.conn.cursor() as cursor:
+                if self.use_copy == True:
+                    data = rds_copy_pull(cursor, self.query, dtype_backend = self.dtype_backend, params = self.params)
+                else:
+                    data = rds_sql_pull(cursor, self.query, dtype_backend = self.dtype_backend, params = self.params, server_side = self._query_input == None)
 
             #Check if Data Empty
             if data.empty == False:
                 #Check Schema
                 if self.check_schema(data):
                     
-                    #Drop Duplicate Data
-                    data = data.drop_duplicates()
-
-                    #Store Duplicate Data
-                    self.duplicates = data[data.duplicated()]
+                    #Store and Drop Duplicate Data, Unless Deduplicated by the Query
+                    if self.distinct == False:
+                        self.duplicates = data[data.duplicated()]
+                        data = data.drop_duplicates()
                     
                     #Update DF with Data
                     self.df = data
@@ -339,10 +527,10 @@ class RDS:
 
                 else:
                     print(f'Missing Fields from Table:  {self.fields_missing}')
-                    raise Exception("Error: DataFrame Schema Did Not Match, Check fields_missing()")
+                    raise RDSError("Error: DataFrame Schema Did Not Match, Check fields_missing()")
                 
             else:
-                raise Exception("Error: DataFrame Emtpy from SQL Query") 
+                raise RDSError("Error: DataFrame Emtpy from SQL Query") 
 
         else:
-            raise Exception("Error: DataFrame Emtpy from SQL Query")
\ No newline at end of file
+            raise RDSError("Error: DataFrame Emtpy from SQL Query")
\ No newline at end of file
@@ -5,8 +5,14 @@ Tidal Basin PostgreSQL database hosted on AWS RDS. These functions are integral
 
 Functions:
 
-    - rds_sql_pull(cursor, query): 
-      Executes a SQL query using the provided cursor, fetches rows, and converts them to a Pandas DataFrame.
+    - rds_sql_pull(cursor, query, chunksize=10000, dtype_backend=None, params=None, server_side=False): 
+      Executes a SQL query, optionally streaming it from a server-side cursor in chunks, and converts the rows to a Pandas DataFrame.
+
+    - rds_copy_pull(cursor, query, dtype_backend=None, params=None): 
+      Streams the result of a SQL query through PostgreSQL's COPY protocol as CSV and parses it into a Pandas DataFrame.
+
+    - rds_bulk_insert(cursor, table, columns, rows, page_size=1000): 
+      Inserts rows into a table in batched multi-row INSERT statements.
 
     - build_clean_list(join_list): 
       Builds a list of cleaning steps based on the join list provided. 
@@ -14,8 +20,21 @@ Functions:
     - build_schema(source=None, join_list=None, schema=None, exclude=None): 
       Constructs a schema list from the source and join list, optionally excluding specified fields. 
       
-    - build_query(source=None, join_list=None, query=None): 
-      Constructs a SQL query from the source and join list. 
+    - build_query(source=None, join_list=None, query=None, distinct=False, filter_empty=False, parameterized=False): 
+      Constructs a SQL query from the source and join list, optionally deduplicating rows, filtering empty fields in SQL, and 
+      leaving the project as a %(project_id)s placeholder to bind with build_params. 
+
+    - build_params(source=None): 
+      Builds the parameters bound to the placeholders of a query constructed by build_query. 
+
+    - cache_key(value): 
+      Serializes a query package (or exclude list) into a JSON string used as a cache key. 
+
+    - template_key(query_package): 
+      Builds the cache key of a query package without its project, so packages differing only by project share cached builds. 
+
+    - cached_schema(package_key, exclude_key), cached_query(package_key, distinct=False, filter_empty=False), cached_clean_list(package_key): 
+      Memoized versions of build_schema, build_query, and build_clean_list for a query package cache key. 
       
     - clean_empty_none(field, df, removed): 
       Cleans rows with empty or None values from the specified field in the DataFrame. 
@@ -33,9 +52,15 @@ Functions:
       
 Dependencies:
     - pandas
-    - codecs
+    - psycopg2
+    - io
+    - json
+    - uuid
+    - functools
+    - itertools
     - datetime
     - rds_clean_utils
+    - rds_errors
 
 Created by: Charles Ross
 Contact: charles.ross@mbakerintl.com
@@ -46,8 +71,16 @@ Last updated by: Charles Ross on 11/19/2024
 
 
 ################    IMPORT PACKAGES    ######################
+import io
+import json
 import pandas as pd
-import codecs
+from psycopg2.extras import execute_values
+from uuid import uuid4
+from functools import lru_cache
+from itertools import chain
+
+################    IMPORT ERRORS    ######################
+from rds_errors import RDSError
 
 ################    IMPORT CLEANING UTILS    ######################
 from rds_clean_utils import clean_empty_none 
@@ -55,6 +88,16 @@ from rds_clean_utils import convert_dates
 from rds_clean_utils import convert_integer
 
 
+################    CLEANING DISPATCH    ######################
+
+#Clean Directive to (Function, Version Label, Returns Removed Rows)
+_CLEAN_DISPATCH = {
+    'NULL' : (clean_empty_none, "Clean Nulls and Empty Fields", True),
+    'DATE_CONVERT': (convert_dates, "Convert String Dates to DateTimes", False),
+    'INT_CONVERT': (convert_integer, "Convert String Numbers to Integers", False)
+    }
+
+
 
 
 ################    RDS QUERY UTILITY FUNCTIONS    ######################
@@ -62,57 +105,201 @@ from rds_clean_utils import convert_integer
 
 #----------------------------------------------------------------
 
-def rds_sql_pull(cursor, query):
+def rds_sql_pull(cursor, query, chunksize = 10000, dtype_backend = None, params = None, server_side = False):
 
     """
-    Executes a SQL query using the provided cursor, fetches rows, and converts them to a Pandas DataFrame.
+    Executes a SQL query, optionally streaming it from a server-side cursor in chunks, and converts the rows to a Pandas DataFrame.
 
     Parameters:
     - cursor: Cursor object for database connection.
     - query: SQL query string to be executed.
+    - chunksize: Number of rows fetched from the server per round trip when `server_side` is set. Default is 10000.
+    - dtype_backend: Optional pandas dtype backend ('pyarrow' or 'numpy_nullable') the DataFrame columns are converted to.
+    - params: Optional dictionary of values bound to the query's %(name)s placeholders, such as the output of `build_params`.
+    - server_side: If True, streams the result from a named (server-side) cursor. Default is False.
 
     Explanation:
-    This function attempts to execute a SQL query using the given cursor. It fetches all rows from the query result 
-    and then converts these rows into a Pandas DataFrame. If the conversion to a DataFrame fails, an exception is raised, 
-    and the process is stopped to indicate the failure. The function ensures that the SQL query is executed 
-    and its results are correctly transformed into a DataFrame format for further data manipulation or analysis.
+    By default this function executes the query on the given cursor and fetches every row at once. With `server_side` set, it 
+    instead opens a named (server-side) cursor on the connection behind the given cursor, so PostgreSQL holds the result 
+    set and streams it back in `chunksize` batches instead of buffering every row client-side in one libpq result. The rows 
+    are collected and converted into a Pandas DataFrame once all rows are fetched. If a `dtype_backend` is given, the columns 
+    are converted with `DataFrame.convert_dtypes`, so text columns are stored as Arrow or nullable strings instead of Python objects. If the conversion to a DataFrame fails, 
+    an exception is raised, and the process is stopped to indicate the failure. Any server-side cursor is always closed 
+    before returning.
 
     Return:
     The DataFrame containing the query results if successful.
 
     Note:
     Any failure in executing the query or converting the result to a DataFrame triggers an exception, 
-    alerting the user to address the issue promptly.
+    alerting the user to address the issue promptly. Server-side cursors are created with DECLARE, which only accepts a 
+    single SELECT or VALUES query, so leave `server_side` unset for other statements such as SET, SHOW, EXPLAIN, 
+    multiple statements, or data-modifying CTEs.
     """
 
     try:
 
-        # Execute Query
-        cursor.execute(query)
-        # Fetch Columns
-        columns = [col[0] for col in cursor.description]
-        # Fetch Rows
-        rows = cursor.fetchall()
+        #Execute on the Given Cursor and Fetch All Rows Unless Streaming Server Side
+        if server_side == False:
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            columns = [col[0] for col in cursor.description]
 
+            return _rows_to_df(rows, columns, dtype_backend)
+
+        #Open Server-Side Cursor on the Same Connection (Held Open Across Commits in Autocommit Mode)
+        conn = cursor.connection
+        stream = conn.cursor(name = f"rds_stream_{uuid4().hex}", withhold = conn.autocommit)
 
         try:
-        
-            #Convert to Dataframe
-            df = pd.DataFrame(rows, columns=columns)
+
+            # Execute Query, Binding Any Parameters
+            stream.execute(query, params)
+            # Fetch First Chunk of Rows
+            rows = stream.fetchmany(chunksize)
+            # Fetch Columns (Server-Side Cursors Describe the Result After the First Fetch)
+            columns = [col[0] for col in stream.description]
+            # Fetch Remaining Rows in Chunks
+            for chunk in iter(lambda: stream.fetchmany(chunksize), []):
+                rows.extend(chunk)
+
+        finally:
+            stream.close()
+
+        return _rows_to_df(rows, columns, dtype_backend)
+
+
+    except Exception as e:
+
+        # Raise Exception to Stop Process if Failure
+        raise RDSError(f"Failed to Pull Rows from Cursor Query Execute: {e}") from e
+
+
+
+
+#----------------------------------------------------------------
+
+def _rows_to_df(rows, columns, dtype_backend):
+
+    #Convert to Dataframe
+    df = pd.DataFrame(rows, columns=columns)
+
+    #Convert to Requested Dtype Backend
+    if dtype_backend != None:
+        df = df.convert_dtypes(dtype_backend = dtype_backend)
+
+    return df
+    
+
+
+
+
+#----------------------------------------------------------------
+
+def rds_copy_pull(cursor, query, dtype_backend = None, params = None):
+
+    """
+    Streams the result of a SQL query through PostgreSQL's COPY protocol as CSV and parses it into a Pandas DataFrame.
+
+    Parameters:
+    - cursor: Cursor object for database connection.
+    - query: SQL query string to be executed.
+    - dtype_backend: Optional pandas dtype backend ('pyarrow' or 'numpy_nullable') the CSV parser builds the DataFrame columns with.
+    - params: Optional dictionary of values bound to the query's %(name)s placeholders, such as the output of `build_params`.
+
+    Explanation:
+    This function wraps the query in `COPY (...) TO STDOUT WITH CSV HEADER` and writes the output into an in-memory buffer 
+    using `cursor.copy_expert`. PostgreSQL sends the whole result as one CSV stream, which is parsed by the pandas C CSV 
+    reader instead of being converted to Python tuples row by row. When a dtype backend is passed, the parser builds 
+    those columns directly rather than converting the parsed DataFrame afterwards. This is typically much faster than `rds_sql_pull` 
+    for large, wide results.
+
+    Return:
+    The DataFrame containing the query results if successful.
+
+    Note:
+    Column dtypes are inferred by the CSV parser rather than taken from PostgreSQL, so values such as zero-padded codes 
+    may come back as numbers, and both NULLs and empty strings are read as NaN. Use `rds_sql_pull` when exact types matter. 
+    COPY does not accept bound parameters, so any `params` are quoted into the query client side with `cursor.mogrify`.
+    """
+
+    try:
+
+        #Quote Parameters into Query (COPY Cannot Bind Parameters)
+        if params != None:
+            query = cursor.mogrify(query, params).decode()
+
+        #Wrap Query in COPY Statement (Trailing Semicolon Not Allowed Inside COPY)
+        copy_query = f"COPY ({query.strip().rstrip(';')}) TO STDOUT WITH CSV HEADER"
+
+        #Copy Rows into Buffer
+        buffer = io.BytesIO()
+        cursor.copy_expert(copy_query, buffer)
+        buffer.seek(0)
+
+
+        try:
+
+            #Parse CSV into Dataframe, Building Columns with the Requested Dtype Backend
+            if dtype_backend != None:
+                df = pd.read_csv(buffer, dtype_backend = dtype_backend)
+            else:
+                df = pd.read_csv(buffer)
+
             return df
 
 
         except Exception as e:
-            
+
             # Raise Exception to Stop Process if Failure
-            raise Exception(f"Rows Pulled from Cursor, Failed to Convert to Pandas Dataframe: {e}")
+            raise RDSError(f"Rows Copied from Query, Failed to Parse into Pandas Dataframe: {e}") from e
 
 
     except Exception as e:
 
         # Raise Exception to Stop Process if Failure
-        raise Exception(f"Failed to Pull Rows from Cursor Query Execute: {e}")
-    
+        raise RDSError(f"Failed to Copy Rows from Query: {e}") from e
+
+
+
+
+
+#----------------------------------------------------------------
+
+def rds_bulk_insert(cursor, table, columns, rows, page_size = 1000):
+
+    """
+    Inserts rows into a table in batched multi-row INSERT statements.
+
+    Parameters:
+    - cursor: Cursor object for database connection.
+    - table: Name of the table to insert into, optionally schema qualified.
+    - columns: List of column names matching the order of values in each row.
+    - rows: Sequence of row tuples to insert.
+    - page_size: Number of rows sent in each INSERT statement. Default is 1000.
+
+    Explanation:
+    This function uses `psycopg2.extras.execute_values` to send the rows as `INSERT INTO table (columns) VALUES (...), (...)` 
+    statements of up to `page_size` rows each, instead of one statement per row as `cursor.executemany` does. This cuts 
+    round trips to the database by roughly a factor of `page_size` for large loads.
+
+    Note:
+    The insert is not committed; the caller commits or rolls back the connection. Table and column names are inserted into 
+    the statement as written, so they must come from trusted code rather than user input.
+    """
+
+    try:
+
+        #Insert Rows in Pages of Multi-Row VALUES Lists
+        insert_query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s"
+        execute_values(cursor, insert_query, rows, page_size = page_size)
+
+
+    except Exception as e:
+
+        # Raise Exception to Stop Process if Failure
+        raise RDSError(f"Failed to Insert Rows into {table}: {e}") from e
+
 
 
 
@@ -136,7 +323,7 @@ def unpack_query(query_package):
 
     Raises:
     -------
-    Exception
+    RDSError
         If the query package exists but does not contain the source or join list components.
 
     Explanation:
@@ -158,13 +345,13 @@ def unpack_query(query_package):
             source = query_package["source"]
         else:
             source = None
-            raise Exception("Query Package Exists, but Not Source Component Identified")
+            raise RDSError("Query Package Exists, but Not Source Component Identified")
         
         if 'join_list' in query_package:
             join_list = query_package["join_list"]
         else:
             source = None
-            raise Exception("Query Package Exists, but Not Join List Component Identified")    
+            raise RDSError("Query Package Exists, but Not Join List Component Identified")    
                            
     #Join List Empty           
     else:
@@ -195,19 +382,21 @@ def build_clean_list(join_list):
     Returns:
     --------
     list
-        A list of dictionaries where each dictionary contains a field and its corresponding cleaning function.
+        A list of dictionaries where each dictionary contains a field, its corresponding cleaning function, the version label 
+        logged for the step, and whether the function also returns the removed rows.
 
     Raises:
     -------
-    Exception
+    RDSError
         If a specified cleaning operation does not match any function in the cleaning dictionary.
 
     Explanation:
     ------------
-    This function creates a cleaning dictionary that maps specific cleaning operations to their respective functions. 
-    It then iterates through the provided join list, extracting the fields and their cleaning operations. 
-    For each operation, it attempts to match it with a function from the cleaning dictionary and adds it to the clean list. 
-    If an operation does not match any function in the dictionary, an exception is raised. 
+    This function uses the module-level cleaning dictionary (`_CLEAN_DISPATCH`) that maps specific cleaning operations to their respective 
+    functions, version labels, and a flag marking functions that return removed rows, so `clean_table` can call each step without checking 
+    which function it holds. It flattens the provided join list into field and cleaning operation pairs in a single comprehension. 
+    Every operation is checked against the cleaning dictionary, and if any do not match a function, an exception listing them is raised. 
+    Otherwise each pair is mapped to its entry in the clean list. 
     The function ensures that all specified cleaning operations are mapped to their respective functions and returns the clean list.
 
     Note:
@@ -218,42 +407,19 @@ def build_clean_list(join_list):
     #If Join List NOT Empty
     if join_list != None:
 
-        #Create Clean Dictionary
-        clean_dict = {
-        'NULL' : clean_empty_none,
-        'DATE_CONVERT': convert_dates,
-        'INT_CONVERT': convert_integer
-        }
-
-        #Create Clean List
-        clean_list = []
-
-        # Cycle Through Clean Lists
-        for item in join_list:
-            for field in item['clean']:
-                for name, calcs in field.items():
-                    for calc in calcs:
-                        
-                        #Attempt to Pull the Function Step from the Dictionary
-                        try:
-
-                            #If Calc in Dictionary
-                            if (clean_dict[calc] != None):
-                                
-                                #Create Entry from Dictionary
-                                entry = {'field': name,
-                                        'function': clean_dict[calc]}
-
-                                #Add to Clean List
-                                clean_list.append(entry)
-
-                    
-                            #If Calc not in Dictionary
-                            elif (clean_dict[calc] == None):
-                                raise Exception(f'Error: {calc} did not match any function in the function dictionary.')
-
-                        except Exception as e:
-                            raise Exception(f"Error: Could not add calc entry to clean list.  Traceback:{e}")  
+        #Flatten Clean Lists into Field and Calc Pairs
+        calcs = [(name, calc) for item in join_list for field in item['clean'] for name, field_calcs in field.items() for calc in field_calcs]
+
+        #Check All Calcs Match a Function in the Dictionary
+        unknown = [calc for name, calc in calcs if calc not in _CLEAN_DISPATCH]
+        if len(unknown) != 0:
+            raise RDSError(f"Error: Could not add calc entry to clean list.  Traceback: {unknown} did not match any function in the function dictionary.")
+
+        #Create Clean List Entries from Dictionary
+        clean_list = [{'field': name,
+                       'function': _CLEAN_DISPATCH[calc][0],
+                       'version': _CLEAN_DISPATCH[calc][1],
+                       'returns_removed': _CLEAN_DISPATCH[calc][2]} for name, calc in calcs]
 
     #Join List Empty           
     else:
@@ -265,6 +431,19 @@ def build_clean_list(join_list):
 
 
 
+#----------------------------------------------------------------
+
+def _flatten_fields(fields):
+
+    #Split Field Dictionaries into Parallel Table Name and Alias Tuples
+    table_names = tuple(tn for field in fields for tn in field.keys())
+    join_names = tuple(jn for field in fields for jn in field.values())
+
+    return table_names, join_names
+
+
+
+
 #----------------------------------------------------------------
 
 def build_schema(source = None, join_list = None, schema = None, exclude = None):
@@ -280,8 +459,8 @@ def build_schema(source = None, join_list = None, schema = None, exclude = None)
         A list of dictionaries containing the join tables and their fields.
     schema : list, optional
         A list of expected columns in the DataFrame.
-    exclude : list, optional
-        A list of fields to be excluded from the schema.
+    exclude : str or list, optional
+        A field name, or a list of fields, to be excluded from the schema.
 
     Returns:
     --------
@@ -290,7 +469,7 @@ def build_schema(source = None, join_list = None, schema = None, exclude = None)
 
     Raises:
     -------
-    Exception
+    RDSError
         If there is an error building the schema from the source or join list.
 
     Explanation:
@@ -312,20 +491,12 @@ def build_schema(source = None, join_list = None, schema = None, exclude = None)
     if (schema == None) & (source != None) & (join_list != None):
         
         try:
-            #Add Fields from Source
-            for field in source['fields']:
-                for tn, jn in field.items():
-                    schema_lst.append(jn)
-
-
-            # Add Fields from Joins
-            for item in join_list:
-                for field in item['fields']:
-                    for tn, jn in field.items():
-                            schema_lst.append(jn)
+            #Add Fields from Source and Joins
+            fields = list(chain(source['fields'], *(item['fields'] for item in join_list)))
+            schema_lst = list(_flatten_fields(fields)[1])
     
         except Exception as e:
-            raise Exception(f"Error: Could not build schema from source or join list, check data packages.  Traceback: {e}")
+            raise RDSError(f"Error: Could not build schema from source or join list, check data packages.  Traceback: {e}") from e
 
 
     #If Source Manually Passed Into Function
@@ -334,6 +505,7 @@ def build_schema(source = None, join_list = None, schema = None, exclude = None)
 
     #Filter Schema List
     if exclude != None:
+        exclude = {exclude} if isinstance(exclude, str) else set(exclude)
         schema_lst = [field for field in schema_lst if field not in exclude]
 
     #Return Schema List
@@ -342,7 +514,7 @@ def build_schema(source = None, join_list = None, schema = None, exclude = None)
 
 #----------------------------------------------------------------
 
-def build_query(source = None, join_list = None, query = None):
+def build_query(source = None, join_list = None, query = None, distinct = False, filter_empty = False, parameterized = False):
 
     """
     Constructs a SQL query from the source and join list or uses a provided query.
@@ -355,6 +527,13 @@ def build_query(source = None, join_list = None, query = None):
         A list of dictionaries containing the join tables and their fields.
     query : str, optional
         An existing SQL query string to be used.
+    distinct : bool, optional
+        If True, builds the query with SELECT DISTINCT so duplicate rows are removed by PostgreSQL. Default is False.
+    filter_empty : bool, optional
+        If True, adds WHERE conditions dropping rows that are NULL or empty in any join field marked for NULL cleaning, 
+        so those rows are never pulled. Default is False.
+    parameterized : bool, optional
+        If True, filters the project on a `%(project_id)s` placeholder instead of the literal project. Default is False.
 
     Returns:
     --------
@@ -363,20 +542,25 @@ def build_query(source = None, join_list = None, query = None):
 
     Raises:
     -------
-    Exception
+    RDSError
         If there is an error pulling fields from the source or join list data packages, or applying project filters and order operations.
 
     Explanation:
     ------------
-    This function constructs a SQL query by first initializing the query string with a SELECT statement. It adds fields from 
+    This function constructs a SQL query by collecting its fragments in a list, starting with a SELECT statement, and joining them 
+    once at the end. It adds fields from 
     the source table and join tables, includes JOIN clauses for the join tables, and applies a WHERE clause to filter by project 
-    and an ORDER BY clause to sort the results. If the source and join list are not provided, it returns the existing query 
+    and an ORDER BY clause to sort the results. By default the project is written into the query, so it runs on its own. With 
+    `parameterized` set, the project is left as a `%(project_id)s` placeholder instead, which must be bound from `build_params(source)` 
+    at execution, so one query text serves every project. If the source and join list are not provided, it returns the existing query 
     passed as an argument. If there is any error during the construction of the query, an exception is raised. The function 
     ensures that the resulting query string is correctly formatted and ready for execution.
 
     Note:
     -----
     Any discrepancy in the source or join list data packages, or failure to apply filters and order operations, will raise an exception.
+    With `distinct` set, PostgreSQL requires the source order field to be one of the selected fields. With `filter_empty` set, rows 
+    filtered in SQL never reach the cleaning steps, so they do not appear in the removed rows of `RDS.clean_table`.
     """
     
     #If Source and Join List Passed, Query 
@@ -385,43 +569,46 @@ def build_query(source = None, join_list = None, query = None):
         #Set Count for Join Sections
         join_count = 1
 
-        #Initialize Query Select
-        query = "SELECT\n"
+        #Initialize Query Parts with Select, Deduplicating Server Side if Selected
+        if distinct == True:
+            parts = ["SELECT DISTINCT\n"]
+        else:
+            parts = ["SELECT\n"]
+
+        #Collect Select Lines, Joined with Commas Once All Fields Are Added
+        select_lines = []
 
         #Add Fields from Source
         try:
-            for field in source['fields']:
-                for tn, jn in field.items():
-                    query += f"    {source['name']}.{tn} AS {jn},\n"
+            table_names, join_names = _flatten_fields(source['fields'])
+            select_lines.extend(f"    {source['name']}.{tn} AS {jn}" for tn, jn in zip(table_names, join_names))
 
         except Exception as e:
-            raise Exception(f"Error: Could not pull fields from Source, check Source data package.  Traceback: {e}")
+            raise RDSError(f"Error: Could not pull fields from Source, check Source data package.  Traceback: {e}") from e
 
 
 
         # Add Fields from Joins
         try:
-            for index, item in enumerate(join_list):
+            for item in join_list:
                 # Add Join Segments
-                for field in item['fields']:
-                    for tn, jn in field.items():
-                        if index == len(join_list) - 1 and field == item['fields'][-1]:
-                            query += f"    {item['name']}.{tn} AS {jn}\n"
-                        else:
-                            query += f"    {item['name']}.{tn} AS {jn},\n"
+                table_names, join_names = _flatten_fields(item['fields'])
+                select_lines.extend(f"    {item['name']}.{tn} AS {jn}" for tn, jn in zip(table_names, join_names))
 
         except Exception as e:
-            raise Exception(f"Error: Could not pull fields from Join List, check Join List data package.  Traceback: {e}")
+            raise RDSError(f"Error: Could not pull fields from Join List, check Join List data package.  Traceback: {e}") from e
+
+        parts.append(",\n".join(select_lines) + "\n")
 
 
 
         #Add Source
         try:
-            query += "\nFROM\n"
-            query += f"    {source['table']} {source['name']}\n"
+            parts.append("\nFROM\n")
+            parts.append(f"    {source['table']} {source['name']}\n")
         
         except Exception as e:
-            raise Exception(f"Error: Could not pull source table or name from Source data package.  Traceback: {e}")
+            raise RDSError(f"Error: Could not pull source table or name from Source data package.  Traceback: {e}") from e
 
 
 
@@ -441,35 +628,56 @@ def build_query(source = None, join_list = None, query = None):
                 elif item['question_source'] == "DATA_SOURCE":
                     question_source = 'initial_join_answers'
                 
-                query += f"\nLEFT JOIN application_data_answer {data_conn} ON {question_source}.{item['source_id']} = {data_conn}.{item['join_id']} AND {data_conn}.question_id = {item['question_id']}"
-                query += f"\nLEFT JOIN {item['data_source']} {item['name']} ON {data_conn}.id = {item['name']}.answer_ptr_id\n"
+                parts.append(f"\nLEFT JOIN application_data_answer {data_conn} ON {question_source}.{item['source_id']} = {data_conn}.{item['join_id']} AND {data_conn}.question_id = {item['question_id']}")
+                parts.append(f"\nLEFT JOIN {item['data_source']} {item['name']} ON {data_conn}.id = {item['name']}.answer_ptr_id\n")
 
         except Exception as e:
-            raise Exception(f"Error: Could not pull join information from join list, check join list data package.  Traceback: {e}")
+            raise RDSError(f"Error: Could not pull join information from join list, check join list data package.  Traceback: {e}") from e
 
 
 
-        #Filter Project
+        #Filter Project, Left as a Placeholder for build_params When Parameterized
         try:
-            query += "\n WHERE \n"
-            query += f"    {source['name']}.project_id = {source['project']}"
+            parts.append("\n WHERE \n")
+
+            if parameterized == True:
+                parts.append(f"    {source['name']}.project_id = %(project_id)s")
+            else:
+                parts.append(f"    {source['name']}.project_id = {source['project']}")
+
+        except Exception as e:
+            raise RDSError(f"Error: Could not apply project filter to query.  Traceback: {e}") from e
+
 
-        except:
-            raise Exception(f"Error: Could not apply project filter to query.  Traceback: {e}")
+
+        #Filter Empty Fields Marked for NULL Cleaning
+        if filter_empty == True:
+            try:
+                #Map Every Alias to Its Column, Since a Clean Step Can Name a Field from the Source or Any Join
+                expressions = {jn: f"{item['name']}.{tn}" for item in chain([source], join_list) for field in item['fields'] for tn, jn in field.items()}
+
+                #Collect Fields Marked for NULL Cleaning Once, in Clean Order
+                null_fields = dict.fromkeys(name for item in join_list for field in item['clean'] for name, calcs in field.items() if 'NULL' in calcs)
+
+                for name in null_fields:
+                    parts.append(f"\n    AND ({expressions[name]} IS NOT NULL AND {expressions[name]}::text <> '')")
+
+            except Exception as e:
+                raise RDSError(f"Error: Could not apply empty field filters to query, check join list data package.  Traceback: {e}") from e
 
 
 
         #Order Project
         try:
-            query += "\n ORDER BY\n"
-            query += f"{source['name']}.{source['order']};"
+            parts.append("\n ORDER BY\n")
+            parts.append(f"{source['name']}.{source['order']};")
         
-        except:
-            raise Exception(f"Error: Could not apply order operations to query.  Traceback: {e}")
+        except Exception as e:
+            raise RDSError(f"Error: Could not apply order operations to query.  Traceback: {e}") from e
         
             
-        #Encode String
-        query = codecs.decode(query.encode(), 'unicode_escape')
+        #Join Query Parts
+        query = "".join(parts)
 
 
 
@@ -479,4 +687,214 @@ def build_query(source = None, join_list = None, query = None):
 
 
     #Return Query
-    return query
\ No newline at end of file
+    return query
+
+
+
+
+#----------------------------------------------------------------
+
+def build_params(source = None):
+
+    """
+    Builds the parameters bound to the placeholders of a query constructed by build_query.
+
+    Parameters:
+    -----------
+    source : dict, optional
+        A dictionary containing the source table and its project.
+
+    Returns:
+    --------
+    dict or None
+        A dictionary mapping placeholder names to values, or None if no source is provided.
+
+    Raises:
+    -------
+    RDSError
+        If the source does not contain a project.
+
+    Explanation:
+    ------------
+    Queries built by `build_query` with `parameterized` set filter the source on `%(project_id)s` rather than the literal project, 
+    so the same query text is reused across projects. This function returns the matching `{'project_id': ...}` dictionary to pass with the query to 
+    `rds_sql_pull` or `rds_copy_pull`. Manually passed queries have no source and need no parameters.
+    """
+
+    #No Source, No Parameters
+    if source == None:
+        return None
+
+    try:
+        return {'project_id': source['project']}
+
+    except Exception as e:
+        raise RDSError(f"Error: Could not pull project from Source, check Source data package.  Traceback: {e}") from e
+
+
+
+
+################    CACHED QUERY PACKAGE BUILDERS    ######################
+
+
+#----------------------------------------------------------------
+
+def cache_key(value):
+
+    """
+    Serializes a query package (or exclude list) into a JSON string used as a cache key.
+
+    Parameters:
+    -----------
+    value : dict, list, or None
+        The query package or exclude list to serialize.
+
+    Returns:
+    --------
+    str
+        JSON string of the value, with dictionary keys kept in their original order.
+
+    Explanation:
+    ------------
+    Query packages are nested dictionaries and lists, which cannot be hashed directly. This function dumps them to JSON 
+    so they can be passed to the `lru_cache` builders below, which rebuild the package from the key. Keys are not sorted, 
+    because the order of the field and clean dictionaries sets the column order, schema, and cleaning order. Values that 
+    are not JSON serializable are converted with `str`.
+    """
+
+    return json.dumps(value, default = str)
+
+
+
+
+#----------------------------------------------------------------
+
+def template_key(query_package):
+
+    """
+    Builds the cache key of a query package without its project, so packages differing only by project share cached builds.
+
+    Parameters:
+    -----------
+    query_package : dict
+        The query package containing the source and join list components.
+
+    Returns:
+    --------
+    str
+        JSON string of the package with the source project removed, from `cache_key`.
+
+    Explanation:
+    ------------
+    The project is bound as a query parameter (see `build_params`) and does not appear in the schema, query, or clean list 
+    built from a package. Dropping it from the key lets every project pulled with the same source and join list reuse 
+    one cached schema, query, and clean list.
+    """
+
+    #Drop Project from Source, Bound as a Parameter Rather Than Built into the Query
+    source = {name: value for name, value in query_package['source'].items() if name != 'project'}
+
+    return cache_key({**query_package, 'source': source})
+
+
+
+
+#----------------------------------------------------------------
+
+@lru_cache(maxsize = 64)
+def _schema_from_key(package_key, exclude_key):
+
+    #Unpack Package and Build Schema Once per Key
+    source, join_list = unpack_query(json.loads(package_key))
+    return tuple(build_schema(source = source, join_list = join_list, exclude = json.loads(exclude_key)))
+
+
+@lru_cache(maxsize = 64)
+def _query_from_key(package_key, distinct, filter_empty):
+
+    #Unpack Package and Build Query Once per Key
+    source, join_list = unpack_query(json.loads(package_key))
+    return build_query(source = source, join_list = join_list, distinct = distinct, filter_empty = filter_empty, parameterized = True)
+
+
+@lru_cache(maxsize = 64)
+def _clean_list_from_key(package_key):
+
+    #Unpack Package and Build Clean List Once per Key
+    source, join_list = unpack_query(json.loads(package_key))
+    return tuple(build_clean_list(join_list = join_list))
+
+
+
+
+#----------------------------------------------------------------
+
+def cached_schema(package_key, exclude_key):
+
+    """
+    Returns the schema list for a query package cache key, building it only the first time the key is seen.
+
+    Parameters:
+    -----------
+    package_key : str
+        Cache key of the query package, from `cache_key`.
+    exclude_key : str
+        Cache key of the exclude list, from `cache_key`.
+
+    Returns:
+    --------
+    list
+        A new list of schema fields, safe for the caller to modify.
+    """
+
+    return list(_schema_from_key(package_key, exclude_key))
+
+
+
+
+#----------------------------------------------------------------
+
+def cached_query(package_key, distinct = False, filter_empty = False):
+
+    """
+    Returns the SQL query for a query package cache key, building it only the first time the key is seen.
+
+    Parameters:
+    -----------
+    package_key : str
+        Cache key of the query package, from `cache_key`.
+    distinct : bool, optional
+        If True, builds the query with SELECT DISTINCT. Default is False.
+    filter_empty : bool, optional
+        If True, filters fields marked for NULL cleaning in SQL. Default is False.
+
+    Returns:
+    --------
+    str
+        The constructed SQL query string, filtering the project on a `%(project_id)s` placeholder bound from `build_params`.
+    """
+
+    return _query_from_key(package_key, distinct, filter_empty)
+
+
+
+
+#----------------------------------------------------------------
+
+def cached_clean_list(package_key):
+
+    """
+    Returns the clean list for a query package cache key, building it only the first time the key is seen.
+
+    Parameters:
+    -----------
+    package_key : str
+        Cache key of the query package, from `cache_key`.
+
+    Returns:
+    --------
+    list
+        A new list of clean list entries, safe for the caller to modify.
+    """
+
+    return [dict(entry) for entry in _clean_list_from_key(package_key)]